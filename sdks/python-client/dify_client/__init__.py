@@ -1 +1,3 @@
-from dify_client.client import ChatClient, CompletionClient, DifyClient
\ No newline at end of file
+from dify_client.client import ChatClient, CompletionClient, DifyClient
+from dify_client.models import FileRef
+from dify_client.response import DifyResponse
@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A small thread-safe LRU cache whose entries expire ``ttl`` seconds after insertion.
+    """
+
+    def __init__(self, maxsize=512, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            now = time.monotonic()
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+
+            # evict on insert: expired entries first, then the least recently used ones
+            for stale_key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                del self._data[stale_key]
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, prefix):
+        """
+        Drop every entry whose key (an ``(endpoint, params)`` tuple) starts with ``prefix``.
+        """
+        with self._lock:
+            for key in [k for k in self._data if k[0].startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
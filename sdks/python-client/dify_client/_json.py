@@ -0,0 +1,17 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj):
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+else:
+    import json
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
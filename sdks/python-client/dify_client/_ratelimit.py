@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket allowing ``rate`` calls per second with bursts of up to ``capacity`` calls.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "ts", "lock")
+
+    def __init__(self, rate, capacity):
+        if capacity < 1:
+            # tokens never exceed the capacity, so a bucket holding less than one would never hand one out
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.ts = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self):
+        """
+        Take a token if one is available and return 0, otherwise return the seconds until the next one.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class AsyncTokenBucket(TokenBucket):
+    """
+    The asyncio flavour of ``TokenBucket``, waiting with ``asyncio.sleep`` instead of blocking the loop.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, rate, capacity):
+        super().__init__(rate, capacity)
+        # asyncio locks may bind to the running loop, so it is created on first use
+        self.lock = None
+
+    async def acquire(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        # waiters queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            wait = self._take()
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self._take()
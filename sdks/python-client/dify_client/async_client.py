@@ -0,0 +1,188 @@
+import asyncio
+
+import aiohttp
+
+from dify_client import _json
+from dify_client._ratelimit import AsyncTokenBucket
+from dify_client.client import (
+    _CHAT_MESSAGES,
+    _COMPLETION_MESSAGES,
+    _CONVERSATION_NAME,
+    _CONVERSATIONS,
+    _FEEDBACKS,
+    _FILES_UPLOAD,
+    _MESSAGES,
+    _PARAMETERS,
+    _filter_none,
+    _normalize_files,
+)
+from dify_client.models import validate_files
+from dify_client.response import DifyResponse
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def enable_uvloop():
+    """
+    Make ``asyncio.run`` and new event loops use uvloop when it is installed.
+
+    Returns whether uvloop is now the event loop policy.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class AsyncDifyClient:
+    def __init__(self, api_key, limit=100, limit_per_host=64, rps=None):
+        self.api_key = api_key
+        self.base_url = "https://api.dify.ai/v1"
+        self._auth = f"Bearer {api_key}"
+
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._session = None
+        self._bucket = AsyncTokenBucket(rps, max(1, rps * 2)) if rps else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        # aiohttp sessions must be created inside a running event loop, so build it on first use
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={"Authorization": self._auth},
+                connector=aiohttp.TCPConnector(
+                    limit=self._limit,
+                    limit_per_host=self._limit_per_host,
+                    keepalive_timeout=60
+                )
+            )
+        return self._session
+
+    async def _send_request(self, method, endpoint, json=None, params=None, stream=False):
+        if self._bucket is not None:
+            await self._bucket.acquire()
+
+        if json is not None:
+            body, headers = _json.dumps(json), _JSON_HEADERS
+        else:
+            body, headers = None, None
+
+        url = self.base_url + endpoint
+        response = await self._get_session().request(method, url, data=body, params=params, headers=headers)
+
+        if stream:
+            return self._iter_sse(response)
+
+        # read the body so the connection goes back to the pool straight away
+        return DifyResponse(response.status, response.headers, await response.read())
+
+    async def _send_request_with_files(self, method, endpoint, data, files):
+        if self._bucket is not None:
+            await self._bucket.acquire()
+
+        form = aiohttp.FormData()
+        for name, value in data.items():
+            form.add_field(name, value)
+        for name, (file_name, file, *rest) in _normalize_files(files).items():
+            form.add_field(name, file, filename=file_name, content_type=rest[0] if rest else None)
+
+        url = self.base_url + endpoint
+        response = await self._get_session().request(method, url, data=form)
+
+        return DifyResponse(response.status, response.headers, await response.read())
+
+    @staticmethod
+    async def _iter_sse(response):
+        """
+        Yield the parsed ``data:`` events of a streaming response.
+
+        The generator releases the response once it is exhausted; callers that stop early
+        should ``aclose()`` it to give the connection back to the pool.
+        """
+        async with response:
+            if response.status >= 400:
+                # raise like blocking calls do, with the error body readable from the exception's response
+                DifyResponse(response.status, response.headers, await response.read()).raise_for_status()
+            async for line in response.content:
+                line = line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                yield _json.loads(line[5:].strip())
+
+    async def message_feedback(self, message_id, rating, user):
+        data = {
+            "rating": rating,
+            "user": user
+        }
+        return await self._send_request("POST", _FEEDBACKS.format(message_id), data)
+
+    async def get_application_parameters(self, user):
+        params = {"user": user}
+        return await self._send_request("GET", _PARAMETERS, params=params)
+
+    async def file_upload(self, user, files):
+        data = {
+            "user": user
+        }
+        return await self._send_request_with_files("POST", _FILES_UPLOAD, data=data, files=files)
+
+
+class AsyncCompletionClient(AsyncDifyClient):
+    async def create_completion_message(self, inputs, response_mode, user, files=None):
+        if files:
+            files = validate_files(files)
+
+        data = {
+            "inputs": inputs,
+            "response_mode": response_mode,
+            "user": user,
+            "files": files
+        }
+        stream = response_mode == "streaming"
+        return await self._send_request("POST", _COMPLETION_MESSAGES, data, stream=stream)
+
+
+class AsyncChatClient(AsyncDifyClient):
+    async def create_chat_message(self, inputs, query, user, response_mode="blocking", conversation_id=None,
+                                  files=None):
+        if files:
+            files = validate_files(files)
+
+        data = {
+            "inputs": inputs,
+            "query": query,
+            "user": user,
+            "response_mode": response_mode,
+            "files": files
+        }
+        if conversation_id:
+            data["conversation_id"] = conversation_id
+
+        stream = response_mode == "streaming"
+        return await self._send_request("POST", _CHAT_MESSAGES, data, stream=stream)
+
+    async def get_conversation_messages(self, user, conversation_id=None, first_id=None, limit=None):
+        params = _filter_none({"user": user, "conversation_id": conversation_id, "first_id": first_id, "limit": limit})
+        return await self._send_request("GET", _MESSAGES, params=params)
+
+    async def get_conversations(self, user, last_id=None, limit=None, pinned=None):
+        params = _filter_none({"user": user, "last_id": last_id, "limit": limit, "pinned": pinned})
+        return await self._send_request("GET", _CONVERSATIONS, params=params)
+
+    async def rename_conversation(self, conversation_id, name, user):
+        data = {"name": name, "user": user}
+        return await self._send_request("POST", _CONVERSATION_NAME.format(conversation_id), data)
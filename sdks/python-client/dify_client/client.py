@@ -1,64 +1,308 @@
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
+
+from dify_client import _json
+from dify_client._cache import TTLCache
+from dify_client._ratelimit import TokenBucket
+from dify_client.models import validate_files
+from dify_client.response import DifyResponse
+
+# endpoints relative to base_url; base_url stays a plain attribute so it can be pointed at a self-hosted API
+_PARAMETERS = "/parameters"
+_FILES_UPLOAD = "/files/upload"
+_MESSAGES = "/messages"
+_FEEDBACKS = "/messages/{}/feedbacks"
+_CONVERSATIONS = "/conversations"
+_CONVERSATION_NAME = "/conversations/{}/name"
+_CHAT_MESSAGES = "/chat-messages"
+_COMPLETION_MESSAGES = "/completion-messages"
+
+_GZIP_HEADERS = {"Content-Encoding": "gzip"}
+# bodies smaller than this are sent as is, compressing them costs more than it saves
+_GZIP_MIN_SIZE = 1024
+
+
+class _Retry(Retry):
+    """
+    Retries GETs on connection, read and 429/5xx errors. POSTs are only retried when the server cannot
+    have run them, on connect errors and 429/503, so generations and feedback are never sent twice.
+    """
+
+    POST_STATUS_FORCELIST = frozenset([429, 503])
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == "POST" and status_code not in self.POST_STATUS_FORCELIST:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # a read or protocol error means the request body may already have been processed
+        if method == "POST" and error is not None and not self._is_connection_error(error):
+            raise error.with_traceback(_stacktrace)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def _filter_none(params):
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def _normalize_files(files):
+    """
+    Turn every value of ``files`` into a ``(filename, fileobj[, content_type[, headers]])`` tuple, naming bare
+    file objects after their file like ``requests`` does.
+    """
+    return {
+        name: value if isinstance(value, (tuple, list)) else (requests.utils.guess_filename(value) or name, value)
+        for name, value in files.items()
+    }
 
 
 class DifyClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, pool_maxsize=64, cache_ttl=30, compress=False, rps=None):
         self.api_key = api_key
         self.base_url = "https://api.dify.ai/v1"
+        self._auth = f"Bearer {api_key}"
+        # gzip large JSON bodies, only for servers that accept Content-Encoding: gzip on requests
+        self.compress = compress
 
-    def _send_request(self, method, endpoint, json=None, params=None, stream=False):
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
+        # GET endpoints are idempotent, so their responses are kept for a short while; cache_ttl=0 disables it
+        self._cache = TTLCache(maxsize=512, ttl=cache_ttl) if cache_ttl else None
+        # client-side rate limit in requests per second, so fan-out stays under the account quota instead of 429ing
+        self._bucket = TokenBucket(rps, max(1, rps * 2)) if rps else None
+
+        self._pool_maxsize = pool_maxsize
+        self._session = self._create_session(pool_maxsize)
+        self._upload_session = self._create_upload_session()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._session.close()
+        if self._upload_session is not None:
+            self._upload_session.close()
+
+    def _create_session(self, pool_maxsize):
+        session = requests.Session()
+        session.headers.update({
+            "Authorization": self._auth,
             "Content-Type": "application/json"
-        }
+        })
+
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=pool_maxsize,
+            max_retries=_Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"]),
+                # hand the last response back to the caller instead of raising RetryError
+                raise_on_status=False
+            )
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    def _create_upload_session(self):
+        # uploads stream a MultipartEncoder that cannot be rewound, so they use a session without retries
+        session = requests.Session()
+        session.headers["Authorization"] = self._auth
+
+        return session
+
+    def map(self, method_name, arg_iter, max_workers=16, on_result=None):
+        """
+        Call ``method_name`` once per kwargs dict of ``arg_iter`` from a thread pool sharing this client's
+        connection pool, and return the results in input order.
+
+        ``on_result`` is called with each result as soon as it completes, e.g. to report progress.
+        """
+        method = getattr(self, method_name)
+        # more workers than pooled connections would only trigger "Connection pool is full" warnings
+        max_workers = min(max_workers, self._pool_maxsize)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(method, **kwargs) for kwargs in arg_iter]
+            if on_result is not None:
+                for future in as_completed(futures):
+                    on_result(future.result())
+
+            return [future.result() for future in futures]
+
+    def map_message_feedback(self, items, **kwargs):
+        return self.map("message_feedback", items, **kwargs)
 
-        url = f"{self.base_url}{endpoint}"
-        response = requests.request(method, url, json=json, params=params, headers=headers, stream=stream)
+    def cache_clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _invalidate(self, prefix):
+        if self._cache is not None:
+            self._cache.invalidate(prefix)
+
+    def _send_request(self, method, endpoint, json=None, params=None, stream=False):
+        cacheable = self._cache is not None and method == "GET" and not stream
+        if cacheable:
+            cache_key = (endpoint, tuple(sorted((params or {}).items())))
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                # a fresh response per hit, so callers mutating .data cannot alter the cached body
+                return DifyResponse(*cached)
+
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+        body = _json.dumps(json) if json is not None else None
+
+        url = self.base_url + endpoint
+        if self.compress and body is not None and len(body) > _GZIP_MIN_SIZE:
+            response = self._request(method, url, gzip.compress(body, compresslevel=1), params, stream,
+                                     headers=_GZIP_HEADERS)
+            if response.status_code == 415:
+                # the server does not understand compressed bodies, stop compressing and resend as is
+                self.compress = False
+                response.close()
+                if self._bucket is not None:
+                    self._bucket.acquire()
+                response = self._request(method, url, body, params, stream)
+        else:
+            response = self._request(method, url, body, params, stream)
+
+        if stream:
+            return response
+
+        response = DifyResponse.from_response(response)
+        if cacheable and response.status_code < 400 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self._cache.set(cache_key, (response.status, response.headers, response.content))
 
         return response
 
+    def _request(self, method, url, body, params, stream, headers=None):
+        # the JSON content type is already set on the session, so send the pre-serialized body as is
+        return self._session.request(method, url, data=body, params=params, headers=headers, stream=stream)
+
     def _send_request_with_files(self, method, endpoint, data, files):
+        # stream the multipart body from the file objects instead of building it in memory
+        encoder = MultipartEncoder(fields={**data, **_normalize_files(files)})
         headers = {
-            "Authorization": f"Bearer {self.api_key}"
+            "Content-Type": encoder.content_type
         }
 
-        url = f"{self.base_url}{endpoint}"
-        response = requests.request(method, url, data=data, headers=headers, files=files)
+        url = self.base_url + endpoint
+        response = self._upload_session.request(method, url, data=encoder, headers=headers)
 
         return response
 
+    @staticmethod
+    def _read(response):
+        return response.content
+
+    @staticmethod
+    def _iter_lines(response):
+        # event streams are always UTF-8, requests would fall back to ISO-8859-1 for text/* without a charset
+        response.encoding = "utf-8"
+        return response.iter_lines(chunk_size=65536, decode_unicode=True)
+
+    def _iter_sse(self, response, invalidate=()):
+        """
+        Yield the parsed ``data:`` events of a streaming response.
+
+        The generator closes the response once it is exhausted; callers that stop early
+        should close it (e.g. with ``contextlib.closing``) to release the connection.
+        Cached GETs under the ``invalidate`` prefixes are dropped only then, once the server
+        has finished (and saved) the streamed message.
+        """
+        try:
+            if response.status_code >= 400:
+                # read the error body before the response is closed so it stays available on the raised error
+                self._read(response)
+            response.raise_for_status()
+            for line in self._iter_lines(response):
+                if not line or not line.startswith("data:"):
+                    continue
+                yield _json.loads(line[5:].strip())
+        finally:
+            response.close()
+            if response.status_code < 400:
+                for prefix in invalidate:
+                    self._invalidate(prefix)
+
     def message_feedback(self, message_id, rating, user):
         data = {
             "rating": rating,
             "user": user
         }
-        return self._send_request("POST", f"/messages/{message_id}/feedbacks", data)
+        response = self._send_request("POST", _FEEDBACKS.format(message_id), data)
+        if response.status_code < 400:
+            self._invalidate(_MESSAGES)
+
+        return response
 
     def get_application_parameters(self, user):
         params = {"user": user}
-        return self._send_request("GET", "/parameters", params=params)
+        return self._send_request("GET", _PARAMETERS, params=params)
 
     def file_upload(self, user, files):
         data = {
             "user": user
         }
-        return self._send_request_with_files("POST", "/files/upload", data=data, files=files)
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+        response = self._send_request_with_files("POST", _FILES_UPLOAD, data=data, files=files)
+        return DifyResponse.from_response(response)
 
 
 class CompletionClient(DifyClient):
     def create_completion_message(self, inputs, response_mode, user, files=None):
+        if files:
+            files = validate_files(files)
+
         data = {
             "inputs": inputs,
             "response_mode": response_mode,
             "user": user,
             "files": files
         }
-        return self._send_request("POST", "/completion-messages", data,
-                                  stream=True if response_mode == "streaming" else False)
+        stream = response_mode == "streaming"
+        response = self._send_request("POST", _COMPLETION_MESSAGES, data, stream=stream)
+
+        return self._iter_sse(response) if stream else response
 
 
 class ChatClient(DifyClient):
-    def create_chat_message(self, inputs, query, user, response_mode="blocking", conversation_id=None, files=None):
+    def __init__(self, api_key, semantic_cache=None, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.semantic_cache = semantic_cache
+
+    def create_chat_message(self, inputs, query, user, response_mode="blocking", conversation_id=None, files=None,
+                            no_cache=False):
+        # only standalone blocking questions can be answered from the semantic cache, pass
+        # no_cache=True for prompts whose answers must not be stored or reused
+        use_semantic_cache = (self.semantic_cache is not None and not no_cache and response_mode == "blocking"
+                              and not conversation_id and not files)
+        if use_semantic_cache:
+            embedding = self.semantic_cache.embed(query)
+            namespace = (user, json.dumps(inputs, sort_keys=True))
+            cached = self.semantic_cache.get(embedding, namespace)
+            if cached is not None:
+                return DifyResponse(*cached)
+
+        if files:
+            files = validate_files(files)
+
         data = {
             "inputs": inputs,
             "query": query,
@@ -69,25 +313,35 @@ class ChatClient(DifyClient):
         if conversation_id:
             data["conversation_id"] = conversation_id
 
-        return self._send_request("POST", "/chat-messages", data,
-                                  stream=True if response_mode == "streaming" else False)
+        stream = response_mode == "streaming"
+        response = self._send_request("POST", _CHAT_MESSAGES, data, stream=stream)
+        # a new message may have started a conversation or extended one
+        if stream:
+            return self._iter_sse(response, invalidate=(_CONVERSATIONS, _MESSAGES))
 
-    def get_conversation_messages(self, user, conversation_id=None, first_id=None, limit=None):
-        params = {"user": user}
+        if response.status_code < 400:
+            self._invalidate(_CONVERSATIONS)
+            self._invalidate(_MESSAGES)
+            if use_semantic_cache:
+                self.semantic_cache.put(embedding, (response.status, response.headers, response.content), namespace)
 
-        if conversation_id:
-            params["conversation_id"] = conversation_id
-        if first_id:
-            params["first_id"] = first_id
-        if limit:
-            params["limit"] = limit
+        return response
 
-        return self._send_request("GET", "/messages", params=params)
+    def get_conversation_messages(self, user, conversation_id=None, first_id=None, limit=None):
+        params = _filter_none({"user": user, "conversation_id": conversation_id, "first_id": first_id, "limit": limit})
+        return self._send_request("GET", _MESSAGES, params=params)
 
     def get_conversations(self, user, last_id=None, limit=None, pinned=None):
-        params = {"user": user, "last_id": last_id, "limit": limit, "pinned": pinned}
-        return self._send_request("GET", "/conversations", params=params)
+        params = _filter_none({"user": user, "last_id": last_id, "limit": limit, "pinned": pinned})
+        return self._send_request("GET", _CONVERSATIONS, params=params)
+
+    def map_rename_conversation(self, items, **kwargs):
+        return self.map("rename_conversation", items, **kwargs)
 
     def rename_conversation(self, conversation_id, name, user):
         data = {"name": name, "user": user}
-        return self._send_request("POST", f"/conversations/{conversation_id}/name", data)
+        response = self._send_request("POST", _CONVERSATION_NAME.format(conversation_id), data)
+        if response.status_code < 400:
+            self._invalidate(_CONVERSATIONS)
+
+        return response
@@ -0,0 +1,54 @@
+import httpx
+
+from dify_client.client import ChatClient, CompletionClient, DifyClient
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class HTTP2DifyClient(DifyClient):
+    """
+    A drop-in ``DifyClient`` sending its requests with ``httpx`` over HTTP/2, so concurrent
+    callers are multiplexed over a single TLS connection.
+    """
+
+    def _create_session(self, pool_maxsize):
+        # no client-level content type: httpx would let it override the multipart one on uploads
+        return httpx.Client(
+            headers={"Authorization": self._auth},
+            transport=httpx.HTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=32),
+                retries=3
+            )
+        )
+
+    def _create_upload_session(self):
+        # uploads go through the httpx client as well
+        return None
+
+    def _request(self, method, url, body, params, stream, headers=None):
+        if body is not None:
+            headers = {**_JSON_HEADERS, **headers} if headers else _JSON_HEADERS
+        request = self._session.build_request(method, url, content=body, params=params, headers=headers)
+
+        return self._session.send(request, stream=stream)
+
+    def _send_request_with_files(self, method, endpoint, data, files):
+        url = self.base_url + endpoint
+        return self._session.request(method, url, data=data, files=files)
+
+    @staticmethod
+    def _read(response):
+        return response.read()
+
+    @staticmethod
+    def _iter_lines(response):
+        return response.iter_lines()
+
+
+class HTTP2CompletionClient(HTTP2DifyClient, CompletionClient):
+    pass
+
+
+class HTTP2ChatClient(HTTP2DifyClient, ChatClient):
+    pass
@@ -0,0 +1,33 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, model_validator
+
+
+class FileRef(BaseModel):
+    """
+    A file attached to a chat or completion message, either by URL or by the id returned from ``file_upload``.
+    """
+
+    # only the fields below are validated, anything else is passed through to the API untouched
+    model_config = ConfigDict(extra="allow")
+
+    type: Literal["image"]
+    transfer_method: Literal["remote_url", "local_file"]
+    url: Optional[str] = None
+    upload_file_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_transfer_method(self):
+        if self.transfer_method == "remote_url" and not self.url:
+            raise ValueError("url is required when transfer_method is remote_url")
+        if self.transfer_method == "local_file" and not self.upload_file_id:
+            raise ValueError("upload_file_id is required when transfer_method is local_file")
+        return self
+
+
+def validate_files(files):
+    """
+    Validate ``files`` locally and return them as plain dicts, raising ``pydantic.ValidationError``
+    before any request is sent.
+    """
+    return [FileRef.model_validate(file).model_dump(exclude_none=True) for file in files]
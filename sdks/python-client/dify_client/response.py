@@ -0,0 +1,55 @@
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Mapping
+
+import requests
+
+from dify_client import _json
+
+
+@dataclass(frozen=True)
+class DifyResponse:
+    """
+    A fully read API response whose JSON body is decoded once, on first access of ``data``.
+    """
+
+    status: int
+    headers: Mapping[str, str]
+    _raw: bytes = field(repr=False)
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response.status_code, response.headers, response.content)
+
+    @cached_property
+    def data(self):
+        return _json.loads(self._raw) if self._raw else None
+
+    @property
+    def raw_text(self):
+        return self._raw.decode("utf-8")
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    # the accessors below mirror requests.Response so existing callers keep working
+
+    @property
+    def status_code(self):
+        return self.status
+
+    @property
+    def content(self):
+        return self._raw
+
+    @property
+    def text(self):
+        return self.raw_text
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status} Error: {self.raw_text}", response=self)
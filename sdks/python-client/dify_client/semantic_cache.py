@@ -0,0 +1,99 @@
+import itertools
+import math
+import threading
+import time
+
+
+class SemanticCache:
+    """
+    An in-memory semantic cache for chat responses.
+
+    Queries are embedded with ``embed`` (any callable turning a string into a vector of floats) and a
+    cached response is returned when a previous query of the same namespace is at least ``threshold``
+    cosine-similar to it.
+    """
+
+    def __init__(self, embed, threshold=0.95, ttl=3600, maxsize=1024):
+        self._embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        # entries across all namespaces in insertion order, plus the keys of each namespace
+        self._entries = {}
+        self._namespaces = {}
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+
+    def embed(self, text):
+        return _normalize(self._embed(text))
+
+    def get(self, embedding, namespace):
+        now = time.monotonic()
+        with self._lock:
+            best_score, best_response = self.threshold, None
+            for key in self._namespaces.get(namespace, ()):
+                _, expires_at, cached_embedding, response = self._entries[key]
+                if expires_at <= now:
+                    continue
+
+                score = sum(a * b for a, b in zip(embedding, cached_embedding))
+                if score >= best_score:
+                    best_score, best_response = score, response
+
+            return best_response
+
+    def put(self, embedding, response, namespace, ttl=None):
+        now = time.monotonic()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[1] <= now]:
+                self._remove(key)
+
+            key = next(self._keys)
+            self._entries[key] = (namespace, expires_at, embedding, response)
+            self._namespaces.setdefault(namespace, []).append(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._namespaces.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        namespace = self._entries.pop(key)[0]
+        keys = self._namespaces[namespace]
+        keys.remove(key)
+        if not keys:
+            del self._namespaces[namespace]
+
+
+def sentence_transformers_embedder(model_name="all-MiniLM-L6-v2"):
+    """
+    Build an ``embed`` callable backed by a local sentence-transformers model.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise ImportError("sentence-transformers is required, install it with "
+                          "`pip install dify-client[semantic-cache]`")
+
+    model = SentenceTransformer(model_name)
+
+    def embed(text):
+        return model.encode(text).tolist()
+
+    return embed
+
+
+def _normalize(vector):
+    vector = [float(value) for value in vector]
+    norm = math.sqrt(sum(value * value for value in vector))
+    if not norm:
+        return vector
+    return [value / norm for value in vector]
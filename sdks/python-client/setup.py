@@ -19,10 +19,20 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.8",
     install_requires=[
-        "requests"
+        "pydantic>=2.0",
+        "requests",
+        "requests-toolbelt",
+        "urllib3>=1.26.0"
     ],
+    extras_require={
+        "async": ["aiohttp>=3.8.0"],
+        "uvloop": ["aiohttp>=3.8.0", "uvloop; platform_system != 'Windows'"],
+        "http2": ["httpx[http2]"],
+        "semantic-cache": ["sentence-transformers"],
+        "speedups": ["orjson"]
+    },
     keywords='dify nlp ai language-processing',
     include_package_data=True,
 )
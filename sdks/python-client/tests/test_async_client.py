@@ -0,0 +1,101 @@
+import io
+import json
+import unittest
+
+import requests
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:
+    raise unittest.SkipTest("aiohttp is not installed, install dify-client[async]")
+
+from dify_client.async_client import AsyncChatClient
+
+
+async def chat_messages(request):
+    body = await request.json()
+    if body["query"] == "fail":
+        return web.json_response({"code": "app_unavailable"}, status=400)
+    if body["response_mode"] != "streaming":
+        return web.json_response({"answer": body["query"], "authorization": request.headers["Authorization"]})
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    for answer in ["Hel", "lo", "你好"]:
+        await response.write(f"data: {json.dumps({'answer': answer})}\n\n".encode())
+    await response.write_eof()
+    return response
+
+
+async def conversations(request):
+    return web.json_response({"query": dict(request.query)})
+
+
+async def files_upload(request):
+    form = await request.post()
+    return web.json_response({"user": form["user"], "name": form["file"].filename,
+                              "size": len(form["file"].file.read())})
+
+
+class TestAsyncChatClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat-messages", chat_messages)
+        app.router.add_get("/v1/conversations", conversations)
+        app.router.add_post("/v1/files/upload", files_upload)
+
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.chat_client = AsyncChatClient("test_api_key")
+        self.chat_client.base_url = str(self.server.make_url("/v1"))
+
+    async def asyncTearDown(self):
+        await self.chat_client.close()
+        await self.server.close()
+
+    async def test_create_chat_message(self):
+        response = await self.chat_client.create_chat_message({}, "Hello", "test_user")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.data, {"answer": "Hello", "authorization": "Bearer test_api_key"})
+
+    async def test_streaming_chat_message_yields_events(self):
+        events = await self.chat_client.create_chat_message({}, "Hello", "test_user", response_mode="streaming")
+
+        self.assertEqual([event["answer"] async for event in events], ["Hel", "lo", "你好"])
+
+    async def test_streaming_chat_message_error_keeps_the_body(self):
+        events = await self.chat_client.create_chat_message({}, "fail", "test_user", response_mode="streaming")
+        with self.assertRaises(requests.HTTPError) as context:
+            [event async for event in events]
+
+        self.assertEqual(context.exception.response.data, {"code": "app_unavailable"})
+
+    async def test_get_conversations_drops_none_params(self):
+        response = await self.chat_client.get_conversations("test_user", limit=5)
+
+        self.assertEqual(response.data, {"query": {"user": "test_user", "limit": "5"}})
+
+    async def test_file_upload(self):
+        files = {"file": ("panda.jpeg", io.BytesIO(b"x" * 100), "image/jpeg")}
+
+        response = await self.chat_client.file_upload("test_user", files)
+
+        self.assertEqual(response.data, {"user": "test_user", "name": "panda.jpeg", "size": 100})
+
+
+    async def test_file_upload_accepts_bare_files_and_pairs(self):
+        bare_file = io.BytesIO(b"x" * 100)
+        bare_file.name = "/tmp/panda.jpeg"
+
+        bare = await self.chat_client.file_upload("test_user", {"file": bare_file})
+        pair = await self.chat_client.file_upload("test_user", {"file": ("koala.jpeg", io.BytesIO(b"x" * 50))})
+
+        self.assertEqual(bare.data, {"user": "test_user", "name": "panda.jpeg", "size": 100})
+        self.assertEqual(pair.data, {"user": "test_user", "name": "koala.jpeg", "size": 50})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,13 +7,19 @@ API_KEY = os.environ.get("API_KEY")
 APP_ID = os.environ.get("APP_ID")
 
 
+@unittest.skipUnless(API_KEY, "API_KEY is not set")
 class TestChatClient(unittest.TestCase):
-    def setUp(self):
-        self.chat_client = ChatClient(API_KEY)
+    @classmethod
+    def setUpClass(cls):
+        cls.chat_client = ChatClient(API_KEY)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.chat_client.close()
 
     def test_create_chat_message(self):
         response = self.chat_client.create_chat_message({}, "Hello, World!", "test_user")
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.data)
 
     def test_create_chat_message_with_vision_model_by_remote_url(self):
         files = [{
@@ -22,7 +28,7 @@ class TestChatClient(unittest.TestCase):
             "url": "your_image_url"
         }]
         response = self.chat_client.create_chat_message({}, "Describe the picture.", "test_user", files=files)
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.data)
 
     def test_create_chat_message_with_vision_model_by_local_file(self):
         files = [{
@@ -31,25 +37,31 @@ class TestChatClient(unittest.TestCase):
             "upload_file_id": "your_file_id"
         }]
         response = self.chat_client.create_chat_message({}, "Describe the picture.", "test_user", files=files)
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.data)
 
     def test_get_conversation_messages(self):
         response = self.chat_client.get_conversation_messages("test_user", "your_conversation_id")
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.raw_text)
 
     def test_get_conversations(self):
         response = self.chat_client.get_conversations("test_user")
-        self.assertIn("data", response.text)
+        self.assertIn("data", response.data)
 
 
+@unittest.skipUnless(API_KEY, "API_KEY is not set")
 class TestCompletionClient(unittest.TestCase):
-    def setUp(self):
-        self.completion_client = CompletionClient(API_KEY)
+    @classmethod
+    def setUpClass(cls):
+        cls.completion_client = CompletionClient(API_KEY)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.completion_client.close()
 
     def test_create_completion_message(self):
         response = self.completion_client.create_completion_message({"query": "What's the weather like today?"},
                                                                     "blocking", "test_user")
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.data)
 
     def test_create_completion_message_with_vision_model_by_remote_url(self):
         files = [{
@@ -59,7 +71,7 @@ class TestCompletionClient(unittest.TestCase):
         }]
         response = self.completion_client.create_completion_message(
             {"query": "Describe the picture."}, "blocking", "test_user", files)
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.data)
 
     def test_create_completion_message_with_vision_model_by_local_file(self):
         files = [{
@@ -69,20 +81,26 @@ class TestCompletionClient(unittest.TestCase):
         }]
         response = self.completion_client.create_completion_message(
             {"query": "Describe the picture."}, "blocking", "test_user", files)
-        self.assertIn("answer", response.text)
+        self.assertIn("answer", response.data)
 
 
+@unittest.skipUnless(API_KEY, "API_KEY is not set")
 class TestDifyClient(unittest.TestCase):
-    def setUp(self):
-        self.dify_client = DifyClient(API_KEY)
+    @classmethod
+    def setUpClass(cls):
+        cls.dify_client = DifyClient(API_KEY)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dify_client.close()
 
     def test_message_feedback(self):
         response = self.dify_client.message_feedback("your_message_id", 'like', "test_user")
-        self.assertIn("success", response.text)
+        self.assertIn("success", response.raw_text)
 
     def test_get_application_parameters(self):
         response = self.dify_client.get_application_parameters("test_user")
-        self.assertIn("user_input_form", response.text)
+        self.assertIn("user_input_form", response.data)
 
     def test_file_upload(self):
         file_path = "your_image_file_path"
@@ -94,7 +112,7 @@ class TestDifyClient(unittest.TestCase):
                 "file": (file_name, file, mime_type)
             }
             response = self.dify_client.file_upload("test_user", files)
-            self.assertIn("name", response.text)
+            self.assertIn("name", response.data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import gzip
+import io
+import json
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    raise unittest.SkipTest("httpx is not installed, install dify-client[http2]")
+
+from dify_client.http2_client import HTTP2ChatClient
+
+
+class MockHTTP2ChatClient(HTTP2ChatClient):
+    """
+    Routes the client's requests to ``handle`` through an ``httpx.MockTransport`` instead of the network.
+    """
+
+    def __init__(self, api_key, **kwargs):
+        self.requests = []
+        super().__init__(api_key, **kwargs)
+
+    def _create_session(self, pool_maxsize):
+        return httpx.Client(headers={"Authorization": self._auth}, transport=httpx.MockTransport(self.handle))
+
+    def handle(self, request):
+        self.requests.append(request)
+        request.read()
+
+        if request.url.path == "/v1/chat-messages":
+            body = json.loads(gzip.decompress(request.content) if "Content-Encoding" in request.headers
+                              else request.content)
+            if body["query"] == "fail":
+                return httpx.Response(400, json={"code": "app_unavailable"})
+            if body["response_mode"] == "streaming":
+                stream = "".join(f"data: {json.dumps({'answer': answer})}\n\n" for answer in ["Hel", "lo", "你好"])
+                return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, content=stream.encode())
+            return httpx.Response(200, json={"answer": body["query"]})
+        if request.url.path == "/v1/files/upload":
+            return httpx.Response(200, json={"content_type": request.headers["Content-Type"]})
+        return httpx.Response(200, json={"query": dict(request.url.params)})
+
+
+class TestHTTP2ChatClient(unittest.TestCase):
+    def setUp(self):
+        self.chat_client = MockHTTP2ChatClient("test_api_key")
+
+    def tearDown(self):
+        self.chat_client.close()
+
+    def test_client_opens_and_closes_an_httpx_client(self):
+        with HTTP2ChatClient("test_api_key") as chat_client:
+            self.assertIsInstance(chat_client._session, httpx.Client)
+            self.assertIsNone(chat_client._upload_session)
+
+        self.assertTrue(chat_client._session.is_closed)
+
+    def test_create_chat_message(self):
+        response = self.chat_client.create_chat_message({}, "Hello", "test_user")
+
+        self.assertEqual(response.data, {"answer": "Hello"})
+        request = self.chat_client.requests[0]
+        self.assertEqual(request.headers["Authorization"], "Bearer test_api_key")
+        self.assertEqual(request.headers["Content-Type"], "application/json")
+
+    def test_compressed_chat_message(self):
+        self.chat_client.compress = True
+
+        response = self.chat_client.create_chat_message({"text": "x" * 2048}, "Hello", "test_user")
+
+        self.assertEqual(response.data, {"answer": "Hello"})
+        self.assertEqual(self.chat_client.requests[0].headers["Content-Encoding"], "gzip")
+
+    def test_streaming_chat_message_yields_events(self):
+        events = self.chat_client.create_chat_message({}, "Hello", "test_user", response_mode="streaming")
+
+        self.assertEqual([event["answer"] for event in events], ["Hel", "lo", "你好"])
+
+    def test_streaming_chat_message_error_keeps_the_body(self):
+        events = self.chat_client.create_chat_message({}, "fail", "test_user", response_mode="streaming")
+        with self.assertRaises(httpx.HTTPStatusError) as context:
+            list(events)
+
+        self.assertEqual(context.exception.response.json(), {"code": "app_unavailable"})
+
+    def test_get_conversations_drops_none_params(self):
+        response = self.chat_client.get_conversations("test_user", limit=5)
+
+        self.assertEqual(response.data, {"query": {"user": "test_user", "limit": "5"}})
+
+    def test_get_responses_are_cached(self):
+        self.chat_client.get_conversations("test_user")
+        self.chat_client.get_conversations("test_user")
+
+        self.assertEqual(len(self.chat_client.requests), 1)
+
+    def test_file_upload_is_multipart(self):
+        files = {"file": ("panda.jpeg", io.BytesIO(b"x" * 100), "image/jpeg")}
+
+        response = self.chat_client.file_upload("test_user", files)
+
+        self.assertTrue(response.data["content_type"].startswith("multipart/form-data; boundary="))
+
+
+if __name__ == "__main__":
+    unittest.main()
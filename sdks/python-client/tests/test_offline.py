@@ -0,0 +1,293 @@
+import gzip
+import io
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from pydantic import ValidationError
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from dify_client.client import ChatClient
+from dify_client.semantic_cache import SemanticCache
+
+
+class StubAdapter(BaseAdapter):
+    """
+    Answers every request of the session it is mounted on with a canned body instead of going to the network.
+    """
+
+    def __init__(self, bodies=None, statuses=None):
+        super().__init__()
+        self.bodies = bodies or {}
+        self.statuses = statuses or []
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+
+        response = requests.Response()
+        response.status_code = self.statuses.pop(0) if self.statuses else 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        path = urlparse(request.url).path
+        response.raw = io.BytesIO(self.bodies.get(path, f'{{"path": "{path}"}}'.encode()))
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    """
+    Records every request and answers with the next status queued on the server, 200 once the queue is empty,
+    or drops the connection without answering when ``drop_connection`` is set.
+    """
+
+    def _respond(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.received.append((self.command, self.path, body))
+        if self.server.drop_connection:
+            # the request was read and possibly processed, but the connection dies before the answer
+            self.close_connection = True
+            return
+
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+
+        payload = b'{"result": "success"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRetries(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), LocalHandler)
+        self.server.received = []
+        self.server.statuses = []
+        self.server.drop_connection = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.chat_client = ChatClient("test_api_key", cache_ttl=0)
+        self.chat_client.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def tearDown(self):
+        self.chat_client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_is_retried_on_server_errors(self):
+        self.server.statuses = [502]
+
+        response = self.chat_client.get_application_parameters("test_user")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(self.server.received), 2)
+
+    def test_post_is_not_retried_on_server_errors(self):
+        self.server.statuses = [500] * 4
+
+        response = self.chat_client.create_chat_message({}, "Hello", "test_user")
+
+        self.assertEqual(response.status, 500)
+        self.assertEqual(len(self.server.received), 1)
+
+    def test_post_is_not_retried_on_read_errors(self):
+        self.server.drop_connection = True
+
+        with self.assertRaises(requests.ConnectionError):
+            self.chat_client.create_chat_message({}, "Hello", "test_user")
+        self.assertEqual(len(self.server.received), 1)
+
+    def test_get_is_retried_on_read_errors(self):
+        self.server.drop_connection = True
+
+        with self.assertRaises(requests.ConnectionError):
+            self.chat_client.get_application_parameters("test_user")
+        self.assertEqual(len(self.server.received), 4)
+
+    def test_post_is_retried_when_unavailable(self):
+        self.server.statuses = [503]
+
+        response = self.chat_client.message_feedback("message_id", "like", "test_user")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(self.server.received), 2)
+
+    def test_file_upload_is_not_retried(self):
+        self.server.statuses = [503]
+        content = b"x" * 5000
+
+        files = {"file": ("panda.jpeg", io.BytesIO(content), "image/jpeg")}
+
+        response = self.chat_client.file_upload("test_user", files)
+
+        self.assertEqual(response.status, 503)
+        self.assertEqual(len(self.server.received), 1)
+        self.assertIn(content, self.server.received[0][2])
+
+    def test_exhausted_retries_return_the_last_response(self):
+        self.server.statuses = [503] * 4
+
+        response = self.chat_client.get_application_parameters("test_user")
+
+        self.assertEqual(response.status, 503)
+        self.assertEqual(len(self.server.received), 4)
+
+
+class TestOfflineChatClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.chat_client = ChatClient("test_api_key")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.chat_client.close()
+
+    def setUp(self):
+        self.adapter = StubAdapter({
+            "/v1/conversations": b'{"data": [], "has_more": false}',
+            "/v1/chat-messages": b'data: {"answer": "Hel"}\n\nevent: ping\n\ndata: {"answer": "lo"}\n\n',
+        })
+        self.chat_client._session.mount("https://", self.adapter)
+        self.chat_client._upload_session.mount("https://", self.adapter)
+        self.chat_client.cache_clear()
+
+    def test_requests_share_the_session(self):
+        self.chat_client.get_application_parameters("test_user")
+        self.chat_client.message_feedback("message_id", "like", "test_user")
+
+        self.assertEqual(len(self.adapter.requests), 2)
+        for request in self.adapter.requests:
+            self.assertEqual(request.headers["Authorization"], "Bearer test_api_key")
+
+    def test_get_conversations_drops_none_params(self):
+        response = self.chat_client.get_conversations("test_user")
+
+        self.assertEqual(response.data, {"data": [], "has_more": False})
+        self.assertEqual(parse_qs(urlparse(self.adapter.requests[0].url).query), {"user": ["test_user"]})
+
+    def test_get_responses_are_cached_until_invalidated(self):
+        first = self.chat_client.get_conversations("test_user")
+        second = self.chat_client.get_conversations("test_user")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.adapter.requests), 1)
+
+        self.chat_client.rename_conversation("conversation_id", "new_name", "test_user")
+        self.chat_client.get_conversations("test_user")
+        self.assertEqual(len(self.adapter.requests), 3)
+
+    def test_cache_hits_do_not_share_decoded_data(self):
+        self.chat_client.get_conversations("test_user").data["data"].append("mutated")
+
+        response = self.chat_client.get_conversations("test_user")
+
+        self.assertEqual(response.data, {"data": [], "has_more": False})
+        self.assertEqual(len(self.adapter.requests), 1)
+
+    def test_semantic_cache_hits_do_not_share_decoded_data(self):
+        chat_client = ChatClient("test_api_key", semantic_cache=SemanticCache(lambda text: [1.0, float(len(text))]))
+        chat_client._session.mount("https://", StubAdapter({"/v1/chat-messages": b'{"answer": "Hi"}'}))
+
+        chat_client.create_chat_message({}, "Hello", "test_user").data["answer"] = "mutated"
+        response = chat_client.create_chat_message({}, "Hello", "test_user")
+
+        self.assertEqual(response.data, {"answer": "Hi"})
+        chat_client.close()
+
+    def test_streaming_chat_message_yields_events(self):
+        events = self.chat_client.create_chat_message({}, "Hello", "test_user", response_mode="streaming")
+
+        self.assertEqual([event["answer"] for event in events], ["Hel", "lo"])
+
+    def test_streaming_chat_message_error_keeps_the_body(self):
+        self.adapter.statuses = [400]
+        self.adapter.bodies["/v1/chat-messages"] = b'{"code": "app_unavailable"}'
+
+        events = self.chat_client.create_chat_message({}, "Hello", "test_user", response_mode="streaming")
+        with self.assertRaises(requests.HTTPError) as context:
+            list(events)
+
+        self.assertEqual(context.exception.response.json(), {"code": "app_unavailable"})
+
+    def test_streaming_chat_message_invalidates_cache_once_finished(self):
+        events = self.chat_client.create_chat_message({}, "Hello", "test_user", response_mode="streaming")
+        next(events)
+
+        # fetched while the answer is still streaming, before the server has saved the message
+        self.chat_client.get_conversation_messages("test_user", "conversation_id")
+        list(events)
+        self.chat_client.get_conversation_messages("test_user", "conversation_id")
+
+        self.assertEqual([urlparse(request.url).path for request in self.adapter.requests],
+                         ["/v1/chat-messages", "/v1/messages", "/v1/messages"])
+
+    def test_large_bodies_are_resent_uncompressed_after_415(self):
+        chat_client = ChatClient("test_api_key", compress=True, rps=100)
+        chat_client._bucket = mock.Mock(wraps=chat_client._bucket)
+        self.adapter.statuses = [415]
+        chat_client._session.mount("https://", self.adapter)
+        inputs = {"text": "x" * 2048}
+
+        response = chat_client.create_chat_message(inputs, "Hello", "test_user")
+
+        self.assertEqual(response.status, 200)
+        self.assertFalse(chat_client.compress)
+        self.assertEqual(chat_client._bucket.acquire.call_count, 2)
+
+        compressed, plain = self.adapter.requests
+        self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.body), plain.body)
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertLess(len(compressed.body), len(plain.body))
+        chat_client.close()
+
+    def test_invalid_files_are_rejected_before_sending(self):
+        files = [{"type": "image", "transfer_method": "remote_url"}]
+
+        with self.assertRaises(ValidationError):
+            self.chat_client.create_chat_message({}, "Describe the picture.", "test_user", files=files)
+        self.assertEqual(self.adapter.requests, [])
+
+    def test_file_upload_accepts_bare_files_and_pairs(self):
+        bare_file = io.BytesIO(b"x" * 100)
+        bare_file.name = "/tmp/panda.jpeg"
+
+        self.chat_client.file_upload("test_user", {"file": bare_file})
+        self.chat_client.file_upload("test_user", {"file": ("koala.jpeg", io.BytesIO(b"x" * 100))})
+
+        bare_body, pair_body = (request.body.read() for request in self.adapter.requests)
+        self.assertIn(b'name="file"; filename="panda.jpeg"', bare_body)
+        self.assertIn(b'name="file"; filename="koala.jpeg"', pair_body)
+
+    def test_unknown_file_keys_are_passed_through(self):
+        files = [{"type": "image", "transfer_method": "remote_url", "url": "https://example.com/panda.jpeg",
+                  "detail": "high"}]
+
+        self.chat_client.create_chat_message({}, "Describe the picture.", "test_user", files=files)
+
+        self.assertEqual(json.loads(self.adapter.requests[0].body)["files"], files)
+
+    def test_map_keeps_input_order(self):
+        items = [{"message_id": f"message_{i}", "rating": "like", "user": "test_user"} for i in range(8)]
+        responses = self.chat_client.map_message_feedback(items, max_workers=4)
+
+        self.assertEqual([response.data["path"] for response in responses],
+                         [f"/v1/messages/message_{i}/feedbacks" for i in range(8)])
+
+
+if __name__ == "__main__":
+    unittest.main()
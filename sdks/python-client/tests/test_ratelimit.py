@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from dify_client import _ratelimit
+from dify_client._ratelimit import AsyncTokenBucket, TokenBucket
+from dify_client.client import ChatClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.multiple(_ratelimit.time, monotonic=self.clock.monotonic, sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_up_to_capacity_does_not_wait(self):
+        bucket = TokenBucket(2, 4)
+        for _ in range(4):
+            bucket.acquire()
+
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_for_the_next_token_once_empty(self):
+        bucket = TokenBucket(2, 4)
+        for _ in range(5):
+            bucket.acquire()
+
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_refills_at_rate_up_to_capacity(self):
+        bucket = TokenBucket(2, 4)
+        for _ in range(4):
+            bucket.acquire()
+
+        self.clock.now += 1
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+        self.clock.now += 60
+        for _ in range(5):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_fractional_rate_waits_between_calls(self):
+        bucket = TokenBucket(0.25, 1)
+        for _ in range(3):
+            bucket.acquire()
+
+        self.assertEqual(self.clock.sleeps, [4.0, 4.0])
+
+    def test_capacity_below_one_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0.25, 0.5)
+
+    def test_client_with_fractional_rps_does_not_hang(self):
+        with ChatClient("test_api_key", rps=0.25) as chat_client:
+            chat_client._bucket.acquire()
+
+        self.assertEqual(chat_client._bucket.capacity, 1)
+        self.assertEqual(self.clock.sleeps, [])
+
+
+class TestAsyncTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(_ratelimit.time, "monotonic", self.clock.monotonic)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_waits_for_tokens_in_order(self):
+        async def acquire_all():
+            bucket = AsyncTokenBucket(2, 2)
+            with mock.patch.object(_ratelimit.asyncio, "sleep", self.clock.async_sleep):
+                await asyncio.gather(*[bucket.acquire() for _ in range(4)])
+
+        asyncio.run(acquire_all())
+
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
+
+    def test_fractional_rate_waits_between_calls(self):
+        async def acquire_all():
+            bucket = AsyncTokenBucket(0.25, 1)
+            with mock.patch.object(_ratelimit.asyncio, "sleep", self.clock.async_sleep):
+                await asyncio.gather(*[bucket.acquire() for _ in range(3)])
+
+        asyncio.run(acquire_all())
+
+        self.assertEqual(self.clock.sleeps, [4.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from dify_client.semantic_cache import SemanticCache
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(lambda text: [1.0, float(len(text))], threshold=0.95, maxsize=10)
+
+    def test_similar_query_hits_within_namespace(self):
+        self.cache.put(self.cache.embed("hello"), "response", "user_1")
+
+        self.assertEqual(self.cache.get(self.cache.embed("hellO"), "user_1"), "response")
+        self.assertIsNone(self.cache.get(self.cache.embed("hello"), "user_2"))
+
+    def test_maxsize_applies_across_namespaces(self):
+        for i in range(50):
+            self.cache.put(self.cache.embed("hello"), f"response_{i}", f"user_{i}")
+
+        self.assertEqual(len(self.cache), 10)
+        self.assertIsNone(self.cache.get(self.cache.embed("hello"), "user_0"))
+        self.assertEqual(self.cache.get(self.cache.embed("hello"), "user_49"), "response_49")
+
+    def test_expired_entries_and_empty_namespaces_are_dropped(self):
+        for i in range(1000):
+            self.cache.put(self.cache.embed("hello"), f"response_{i}", f"user_{i}", ttl=0)
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(list(self.cache._namespaces), ["user_999"])
+
+
+if __name__ == "__main__":
+    unittest.main()